@@ -1,6 +1,17 @@
+import os
+
 from django.apps import AppConfig
 
 
 class QuizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz'
+
+    def ready(self):
+        # Prewarm the normalized question bank so the first request after a
+        # (serverless) cold start doesn't pay for parsing every quiz file.
+        if os.environ.get('MCQ_PREWARM', '1') in ('0', 'false', 'False'):
+            return
+        from quiz.views import _warm_question_cache
+
+        _warm_question_cache()
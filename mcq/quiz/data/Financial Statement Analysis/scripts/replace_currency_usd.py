@@ -2,46 +2,49 @@
 import sys
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Compiled once at import; transform() runs over every JSON file in the tree.
+PRE_FIX = re.compile(r'USD(?=\s*\d[^$]*\$)')
+DISP_MATH = re.compile(r"\$\$.*?\$\$", re.DOTALL)
+# NUL-delimited so it can never collide with text already in a JSON file (raw NUL is invalid JSON)
+DISP_PLACEHOLDER = re.compile(r"\x00DISP_MATH_(\d+)\x00")
+# One scan over the masked text: inline math is kept verbatim, 'US$'/'$' before a digit -> 'USD'.
+INLINE_OR_CURRENCY = re.compile(r"(?P<inline>\$(?!\s*[\d(]).*?\$)|(?P<cur>(?:US)?\$(?=\s*[\d(]))", re.DOTALL)
+POST_FIX = re.compile(r'USD(?=\s*\d[^$\n]{0,120}\$)')
+
+
+def _inline_or_currency(m):
+    return "USD" if m.lastgroup == "cur" else m.group(0)
 
 
 def transform(text: str) -> str:
     # Pre-fix: revert prior mistaken replacements like 'USD32 ... $' back to math start '$'
-    text = re.sub(r'USD(?=\s*\d[^$]*\$)', '$', text)
+    text = PRE_FIX.sub('$', text)
 
-    # Mask display math $$...$$
-    disp_pat = re.compile(r"\$\$.*?\$\$", re.DOTALL)
+    # Mask display math $$...$$ so inline/currency matching never sees its dollars
     disp_segments = []
 
     def _mask_disp(m):
-        idx = len(disp_segments)
         disp_segments.append(m.group(0))
-        return f"__DISP_MATH_{idx}__"
-
-    text = disp_pat.sub(_mask_disp, text)
-
-    # Mask inline math $...$ that does NOT start with a currency-like pattern
-    inline_pat = re.compile(r"\$(?!\s*[\d(]).*?\$", re.DOTALL)
-    inline_segments = []
+        return f"\x00DISP_MATH_{len(disp_segments) - 1}\x00"
 
-    def _mask_inline(m):
-        idx = len(inline_segments)
-        inline_segments.append(m.group(0))
-        return f"__INLINE_MATH_{idx}__"
+    text = DISP_MATH.sub(_mask_disp, text)
 
-    text = inline_pat.sub(_mask_inline, text)
+    # Inline math passes through unchanged; currency outside it becomes 'USD'
+    text = INLINE_OR_CURRENCY.sub(_inline_or_currency, text)
 
-    # Currency replacements: 'US$' -> 'USD', then standalone '$' before digits/paren -> 'USD'
-    text = re.sub(r"US\$(?=\s*[\d(])", "USD", text)
-    text = re.sub(r"\$(?=\s*[\d(])", "USD", text)
+    # Unmask display math
+    if disp_segments:
+        def _unmask_disp(m):
+            i = int(m.group(1))
+            return disp_segments[i] if i < len(disp_segments) else m.group(0)
 
-    # Unmask math segments
-    for idx, seg in enumerate(inline_segments):
-        text = text.replace(f"__INLINE_MATH_{idx}__", seg)
-    for idx, seg in enumerate(disp_segments):
-        text = text.replace(f"__DISP_MATH_{idx}__", seg)
+        text = DISP_PLACEHOLDER.sub(_unmask_disp, text)
 
     # Post-fix: recover any inline math pairs accidentally broken earlier, e.g., 'USD32 ... 15$' -> '$32 ... 15$'
-    text = re.sub(r'USD(?=\s*\d[^$\n]{0,120}\$)', '$', text)
+    text = POST_FIX.sub('$', text)
 
     return text
 
@@ -49,6 +52,9 @@ def transform(text: str) -> str:
 def process_file(path: str) -> int:
     with open(path, 'r', encoding='utf-8') as f:
         original = f.read()
+    # Every rewrite in transform() needs a '$' somewhere in the text
+    if '$' not in original:
+        return 0
     transformed = transform(original)
     if transformed != original:
         with open(path, 'w', encoding='utf-8') as f:
@@ -58,12 +64,15 @@ def process_file(path: str) -> int:
 
 
 def main(root: str) -> int:
-    changed = 0
-    for dirpath, _, filenames in os.walk(root):
-        for fn in filenames:
-            if fn.lower().endswith('.json'):
-                path = os.path.join(dirpath, fn)
-                changed += process_file(path)
+    paths = [
+        os.path.join(dirpath, fn)
+        for dirpath, _, filenames in os.walk(root)
+        for fn in filenames
+        if fn.lower().endswith('.json')
+    ]
+    # Files are independent and the work is CPU-bound regex, so fan out across processes
+    with ProcessPoolExecutor() as ex:
+        changed = sum(ex.map(process_file, paths, chunksize=16))
     print(f"Files updated: {changed}")
     return 0
 
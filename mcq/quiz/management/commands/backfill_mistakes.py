@@ -1,44 +1,52 @@
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
 # Reuse helpers and normalization from views
 from quiz.views import (
-    DATA_DIR,
-    _normalize_questions,
+    _json_dumps,
+    _json_loads,
+    _list_data_files,
+    _load_normalized,
     _upstash_call,
     _upstash_cfg,
+    _upstash_pipeline,
+)
+
+# Conditional LSETs sent per /pipeline request when applying updates
+PIPELINE_BATCH = 100
+# Items per LRANGE request, and how many of those requests run at once
+FETCH_CHUNK = 1000
+FETCH_WORKERS = 8
+# Full refetches allowed while the list keeps changing during the read
+FETCH_ATTEMPTS = 3
+# LSET only if the element at the index is still the one that was read, so a
+# concurrent LPUSH shifting indices can't make us overwrite a different record
+LSET_IF_UNCHANGED = (
+    "if redis.call('LINDEX', KEYS[1], ARGV[1]) == ARGV[2] then "
+    "redis.call('LSET', KEYS[1], ARGV[1], ARGV[3]) return 1 end return 0"
 )
 
 
 def _iter_all_questions():
     """Yield normalized questions from every JSON under data/, with a derived topic.
 
-    Topic is taken from extras['topic'] if present, else from the top-level folder name.
+    Topic is taken from extras['topic'] if present, else extras['category'], else the
+    top-level folder name (filled in when the file is loaded into the question cache).
     """
-    base = DATA_DIR.resolve()
-    for p in sorted(base.rglob("*.json")):
+    for p in _list_data_files():
         if p.name.lower() == "mistakes.json":
             continue
         try:
-            with p.open("r", encoding="utf-8") as f:
-                raw = json.load(f)
-            qs = _normalize_questions(raw)
+            qs = _load_normalized(p)
         except Exception:
             continue
-        # Derive topic from path if not present
-        try:
-            rel = p.relative_to(base)
-            parts = list(rel.parts)
-            topic_from_path = parts[0] if len(parts) > 1 else "General"
-        except Exception:
-            topic_from_path = "General"
         for q in qs:
             extras = dict(q.get("extras") or {})
             if not extras.get("topic"):
-                extras["topic"] = extras.get("category") or topic_from_path
+                extras["topic"] = extras.get("category")
             yield {
                 "text": q.get("text") or "",
                 "choices": list(q.get("choices") or []),
@@ -58,6 +66,54 @@ def _signature(choices, answer):
     return (norm_choices, a)
 
 
+def _list_len(key):
+    res = _upstash_call("llen", key)
+    n = res.get("result") if isinstance(res, dict) else None
+    return n if isinstance(n, int) else None
+
+
+def _fetch_list(key):
+    """Read the whole Upstash list as concurrent chunked LRANGEs; None on any failure.
+
+    The chunks are not one atomic read, so the fetch is retried while the list
+    length changes underneath it (e.g. the live app LPUSHing a new mistake).
+    """
+
+    def fetch(start):
+        return _upstash_call("lrange", key, str(start), str(start + FETCH_CHUNK - 1))
+
+    for _ in range(FETCH_ATTEMPTS):
+        n = _list_len(key)
+        if n is None:
+            return None
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+            chunks = list(ex.map(fetch, range(0, n, FETCH_CHUNK)))
+        arr = []
+        for res in chunks:
+            if not (isinstance(res, dict) and isinstance(res.get("result"), list)):
+                return None
+            arr.extend(res["result"])
+        if len(arr) == n and _list_len(key) == n:
+            return arr
+    return None
+
+
+def _flush(pending, counts):
+    """Send one batch of conditional LSETs and add its outcomes to ``counts``."""
+    updated, skipped, failed = counts
+    res = _upstash_pipeline(pending)
+    if not isinstance(res, list) or len(res) != len(pending):
+        return updated, skipped, failed + len(pending)
+    for r in res:
+        if not isinstance(r, dict) or "error" in r:
+            failed += 1
+        elif r.get("result") == 1:
+            updated += 1
+        else:
+            skipped += 1
+    return updated, skipped, failed
+
+
 class Command(BaseCommand):
     help = "Backfill Upstash mistakes with missing text and topic by matching local question bank"
 
@@ -88,27 +144,29 @@ class Command(BaseCommand):
         do_apply = opts["apply"]
         limit = opts["limit"] or -1
 
-        # Build lookup from local question bank
+        # Build lookup from local question bank; only the first match per signature is used
         lookup = {}
         for q in _iter_all_questions():
-            sig = _signature(q.get("choices"), q.get("answer"))
-            lookup.setdefault(sig, []).append(q)
+            lookup.setdefault(_signature(q["choices"], q["answer"]), q)
 
         # Fetch full list from Upstash
-        res = _upstash_call("lrange", key, "0", "-1")
-        if not (isinstance(res, dict) and isinstance(res.get("result"), list)):
-            raise CommandError("Failed to LRANGE from Upstash; check credentials and key")
-        arr = res["result"]
+        arr = _fetch_list(key)
+        if arr is None:
+            raise CommandError(
+                "Failed to LRANGE a consistent snapshot from Upstash; check credentials and key, or retry"
+            )
         n = len(arr)
 
-        updated = 0
+        # (updated, skipped because the item changed since it was read, failed)
+        counts = (0, 0, 0)
         examined = 0
+        pending = []
         for idx, raw in enumerate(arr):
             if limit >= 0 and examined >= limit:
                 break
             examined += 1
             try:
-                item = json.loads(raw) if isinstance(raw, str) else raw
+                item = _json_loads(raw) if isinstance(raw, str) else raw
             except Exception:
                 continue
             if not isinstance(item, dict):
@@ -117,9 +175,7 @@ class Command(BaseCommand):
             changed = False
             choices = item.get("choices") or []
             answer = item.get("answer") or 0
-            sig = _signature(choices, answer)
-            match_list = lookup.get(sig) or []
-            match = match_list[0] if match_list else None
+            match = lookup.get(_signature(choices, answer))
 
             # Fill missing text
             text = (item.get("text") or "").strip()
@@ -139,15 +195,22 @@ class Command(BaseCommand):
                     item["extras"] = extras
                     changed = True
 
-            if changed and do_apply:
-                # Write back in-place at the same index
-                payload = json.dumps(item, ensure_ascii=False)
-                _ = _upstash_call("lset", key, str(idx), payload)
-                updated += 1
+            if changed and do_apply and isinstance(raw, str):
+                # Write back in-place at the same index, batched into pipeline requests
+                payload = _json_dumps(item)
+                pending.append(["EVAL", LSET_IF_UNCHANGED, "1", key, str(idx), raw, payload])
+                if len(pending) >= PIPELINE_BATCH:
+                    counts = _flush(pending, counts)
+                    pending = []
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Backfill complete: examined={examined}, updated={updated}, total_in_list={n}, apply={do_apply}"
-            )
+        if pending:
+            counts = _flush(pending, counts)
+
+        summary = (
+            f"examined={examined}, updated={counts[0]}, skipped_changed={counts[1]}, "
+            f"failed={counts[2]}, total_in_list={n}, apply={do_apply}"
         )
+        if counts[2]:
+            raise CommandError(f"Backfill incomplete, some LSETs failed: {summary}")
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete: {summary}"))
 
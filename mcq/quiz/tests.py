@@ -1,6 +1,22 @@
-from django.test import TestCase
+import html
+import http.client
+import json
+import os
+import queue
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-from quiz.views import _render_choice_html, _render_stem_html
+from django.test import RequestFactory, TestCase
+
+from quiz import views
+from quiz.views import (
+    _fix_mojibake,
+    _load_normalized,
+    _render_choice_html,
+    _render_stem_html,
+    _score_and_streak,
+)
 
 
 class StemRenderingTests(TestCase):
@@ -18,3 +34,223 @@ class StemRenderingTests(TestCase):
         self.assertIn("\\dfrac{PMT_t}{(1 + r)^t}$", html)
         self.assertNotIn("<p>", html)
         self.assertIn("PMT_t", html)
+
+
+class QuizFileCacheTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "quiz.json"
+        self.path.write_text(json.dumps([{"text": "Q1", "choices": ["a", "b"], "answer": 1}]), encoding="utf-8")
+
+    def test_repeat_loads_reuse_normalized_list(self):
+        first = _load_normalized(self.path)
+        self.assertIs(first, _load_normalized(self.path))
+        self.assertEqual(first[0]["answer"], 1)
+
+    def test_modified_file_is_reparsed(self):
+        first = _load_normalized(self.path)
+        self.path.write_text(json.dumps([{"text": "Q2", "choices": ["a", "b"], "answer": 0}]), encoding="utf-8")
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        second = _load_normalized(self.path)
+        self.assertIsNot(first, second)
+        self.assertEqual(second[0]["text"], "Q2")
+
+
+class MojibakeTests(TestCase):
+    def test_windows_1252_sequences_are_repaired(self):
+        self.assertEqual(_fix_mojibake("companyâ€™s â€œnetâ€\ufffd â€“ cafÃ©"), "company’s “net” – café")
+
+    def test_clean_text_is_untouched(self):
+        text = "Price rose 5% to €100 — a “clean” string"
+        self.assertIs(_fix_mojibake(text), text)
+
+
+class DataListingCacheTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "Equity").mkdir()
+        (self.root / "Equity" / "A.json").write_text("[]", encoding="utf-8")
+        patcher = mock.patch.multiple(views, DATA_DIR=self.root, _LIST_CACHE={"listing": None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_listing_is_reused_until_a_directory_changes(self):
+        first = views._list_data_files()
+        self.assertEqual([p.name for p in first], ["A.json"])
+        self.assertIs(first, views._list_data_files())
+
+        sub = self.root / "Equity"
+        (sub / "B.json").write_text("[]", encoding="utf-8")
+        st = sub.stat()
+        os.utime(sub, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertEqual([p.name for p in views._list_data_files()], ["A.json", "B.json"])
+
+    def test_listed_data_file_accepts_only_plain_files_inside_data(self):
+        outside = self.root.parent / f"{self.root.name}-outside.json"
+        outside.write_text("[]", encoding="utf-8")
+        self.addCleanup(outside.unlink)
+        (self.root / "Equity" / "Link.json").symlink_to(outside)
+        self.assertEqual(views._listed_data_file("Equity/A.json"), self.root / "Equity" / "A.json")
+        self.assertEqual(views._listed_data_file("Equity/../Equity/A.json"), self.root / "Equity" / "A.json")
+        self.assertIsNone(views._listed_data_file("Equity/Link.json"))
+        self.assertIsNone(views._listed_data_file(f"../{outside.name}"))
+
+    def test_home_groups_follow_the_listing(self):
+        (self.root / "Top.json").write_text("[]", encoding="utf-8")
+        with mock.patch.object(views, "_HOME_GROUPS_CACHE", {"entry": None}):
+            groups = views._home_groups()
+            self.assertEqual(
+                [(g["section"], [i["relpath"] for i in g["items"]]) for g in groups],
+                [("Equity", ["Equity/A.json"]), ("General", ["Top.json"])],
+            )
+            self.assertIs(groups, views._home_groups())
+
+
+class ScoreAndStreakTests(TestCase):
+    def test_trailing_and_longest_runs(self):
+        self.assertEqual(_score_and_streak([True, True, True, False, True, True]), (5, 2, 3))
+
+    def test_wrong_last_answer_resets_streak(self):
+        self.assertEqual(_score_and_streak([True, False]), (1, 0, 1))
+        self.assertEqual(_score_and_streak([]), (0, 0, 0))
+
+
+class QuizContextTests(TestCase):
+    def setUp(self):
+        raw = [
+            {"text": "Q1", "choices": ["a", "b"], "answer": 1},
+            {"text": "Q2", "choices": ["a", "b"], "answer": 0, "topic": "Equity"},
+        ]
+        self.questions = views._prepare_for_client(views._normalize_questions(raw), None)
+
+    def test_post_is_graded_and_wrong_answers_recorded(self):
+        request = RequestFactory().post("/", {"q0": "1", "q1": "1"})
+        with mock.patch.object(views, "_record_mistakes") as record:
+            context = views._quiz_context(request, self.questions)
+        record.assert_called_once_with([self.questions[1]])
+        self.assertEqual((context["score"], context["total"]), (1, 2))
+        self.assertEqual([q["selected"] for q in context["questions"]], [1, 1])
+
+    def test_with_extras_refreshes_client_json(self):
+        q = views._with_extras(self.questions[0], {"source_file": "x.json"})
+        self.assertEqual(
+            json.loads(html.unescape(q["_template"]["json"]))["extras"], {"source_file": "x.json"}
+        )
+        self.assertIs(q["_template"]["text_html"], self.questions[0]["_template"]["text_html"])
+        self.assertNotIn("topic", self.questions[0]["extras"])
+
+
+class UpstashRequestTests(TestCase):
+    def _send(self, stale):
+        fresh = mock.Mock(sock=None)
+        fresh.getresponse.return_value = mock.Mock(
+            status=200, will_close=False, read=mock.Mock(return_value=b'{"result": 1}')
+        )
+        local = mock.Mock(conn=stale, netloc=("https", "example.upstash.io"))
+        with mock.patch.object(views, "_UPSTASH_LOCAL", local), mock.patch.object(
+            http.client, "HTTPSConnection", return_value=fresh
+        ):
+            return views._upstash_request("POST", "https://example.upstash.io", "t", "/pipeline", body="[]")
+
+    def _stale(self, error):
+        stale = mock.Mock(sock=None)
+        stale.getresponse.side_effect = error
+        return stale
+
+    def test_dropped_keep_alive_connection_is_retried(self):
+        self.assertEqual(self._send(self._stale(http.client.RemoteDisconnected())), {"result": 1})
+
+    def test_timeout_is_not_retried(self):
+        with self.assertRaises(TimeoutError):
+            self._send(self._stale(TimeoutError()))
+
+    def test_reset_while_reading_body_is_not_retried(self):
+        stale = mock.Mock(sock=None)
+        stale.getresponse.return_value.read.side_effect = ConnectionResetError()
+        with self.assertRaises(ConnectionResetError):
+            self._send(stale)
+
+
+class LocalMistakesStoreTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        self.legacy = root / "mistakes.json"
+        patcher = mock.patch.multiple(
+            views,
+            DATA_DIR=root,
+            MISTAKES_PATH=self.legacy,
+            MISTAKES_LOG_PATH=root / "mistakes.jsonl",
+            _MISTAKES_READ_CACHE={"ts": 0.0, "items": None},
+            _MISTAKES_COUNT_CACHE={"ts": 0.0, "count": None},
+            _upstash_cfg=lambda: (None, None),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_appends_follow_legacy_list(self):
+        self.legacy.write_text(json.dumps([{"text": "old"}]), encoding="utf-8")
+        views._append_mistakes([{"text": "new 1", "_template": {"json": "{}"}}])
+        views._append_mistakes([{"text": "new 2"}])
+        self.assertEqual(
+            views._load_mistakes_list(),
+            [{"text": "old"}, {"text": "new 1"}, {"text": "new 2"}],
+        )
+        self.assertEqual(views._mistakes_count(), 3)
+
+    def test_malformed_record_is_skipped(self):
+        views._append_mistakes([{"text": "x", "answer": "B"}, {"text": "ok", "choices": ["a", "b"], "answer": 1}])
+        with mock.patch.object(views, "_MISTAKES_PREPARED", {"entry": None}):
+            questions = views._mistakes_questions()
+        self.assertEqual([q["text"] for q in questions], ["ok"])
+
+    def test_count_skips_blank_log_lines(self):
+        views.MISTAKES_LOG_PATH.write_bytes(b'{"text": "a"}\n\n  \n{"text": "b"}\n')
+        self.assertEqual(views._count_local_mistakes(), len(views._read_local_mistakes()))
+
+    def test_count_is_cached_until_the_next_write(self):
+        views._append_mistakes([{"text": "a"}])
+        self.assertEqual(views._mistakes_count(), 1)
+        with mock.patch.object(views, "_count_local_mistakes") as count:
+            self.assertEqual(views._mistakes_count(), 1)
+        count.assert_not_called()
+        views._append_mistakes([{"text": "b"}])
+        self.assertEqual(views._mistakes_count(), 2)
+
+    def test_full_writer_queue_falls_back_to_inline_write(self):
+        worker = mock.Mock(is_alive=mock.Mock(return_value=True))
+        q = queue.Queue(maxsize=1)
+        with mock.patch.multiple(
+            views, _ASYNC_MISTAKES=True, _MISTAKE_QUEUE=q, _mistake_worker=worker
+        ), mock.patch.object(views, "_append_mistakes") as append:
+            views._record_mistakes([{"text": "a"}, {"text": "b"}, {"text": "c"}])
+        self.assertEqual(q.get_nowait(), {"text": "a"})
+        append.assert_called_once_with([{"text": "b"}, {"text": "c"}])
+
+    def test_shutdown_flush_writes_queued_mistakes(self):
+        q = queue.Queue()
+        q.put({"text": "a"})
+        q.put({"text": "b"})
+        with mock.patch.object(views, "_MISTAKE_QUEUE", q):
+            views._flush_mistake_queue(timeout=1.0)
+        self.assertEqual(views._read_local_mistakes(), [{"text": "a"}, {"text": "b"}])
+        self.assertEqual(q.unfinished_tasks, 0)
+
+    def test_batch_goes_through_one_pipeline_call(self):
+        calls = []
+
+        def pipeline(commands):
+            calls.append(commands)
+            return [{"result": 1}, {"error": "ERR"}]
+
+        with mock.patch.object(views, "_upstash_pipeline", pipeline):
+            views._append_mistakes([{"text": "a"}, {"text": "b"}])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([c[0] for c in calls[0]], ["LPUSH", "LPUSH"])
+        # Only the rejected command falls back to the local log
+        self.assertEqual(views._read_local_mistakes(), [{"text": "b"}])
@@ -1,11 +1,17 @@
+import atexit
+import http.client
 import json
 import os
+import queue
 import random
 import re
-import urllib.request
+import threading
+import time
 import urllib.parse
+from collections import defaultdict
 from html import escape
 from pathlib import Path
+from stat import S_ISREG
 
 from django.shortcuts import redirect, render
 from django.urls import reverse
@@ -14,9 +20,29 @@ from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.utils.safestring import mark_safe
 
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib codec is the fallback
+    orjson = None
+
+
+def _json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to compact JSON with non-ASCII kept as-is, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    # Compact separators, matching orjson's output
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
 
 def _choose_data_path() -> Path:
-    base = Path(__file__).resolve().parent / "data"
+    base = DATA_DIR
 
     env_rel = os.environ.get("MCQ_DEFAULT_JSON")
     if env_rel:
@@ -36,76 +62,142 @@ def _choose_data_path() -> Path:
         if p.exists():
             return p
 
-    for p in sorted(base.rglob("*.json")):
-        if p.name.lower() == "mistakes.json":
-            continue
-        try:
-            if p.is_file() and p.is_relative_to(base):
-                return p
-        except Exception:
-            continue
+    # The cached listing is rooted at DATA_DIR and only contains regular files
+    files = _list_data_files()
+    for p in files:
+        if p.name.lower() != "mistakes.json":
+            return p
 
-    available = ", ".join(sorted(str(p.relative_to(base)) for p in base.rglob("*.json")))
+    available = ", ".join(sorted(str(p.relative_to(base)) for p in files))
     raise FileNotFoundError(f"No quiz JSON found in {base}. Available: {available}")
 
 
-DATA_DIR = Path(__file__).resolve().parent / "data"
+# Resolved once so per-request containment checks don't re-resolve the root
+DATA_DIR = (Path(__file__).resolve().parent / "data").resolve()
 MISTAKES_PATH = DATA_DIR / "mistakes.json"
+# Local fallback store: one JSON object per line, appended without rewriting history.
+# A legacy MISTAKES_PATH list, if present, is still read ahead of these entries.
+MISTAKES_LOG_PATH = DATA_DIR / "mistakes.jsonl"
+# "listing" is (dir mtimes, sorted quiz files under DATA_DIR, path strings of the
+# listed files that are not symlinks), swapped in as one tuple so readers never mix scans.
+_LIST_CACHE: dict = {"listing": None}
+
+
+def _scan_json_files(root: Path) -> tuple[list[Path], dict[str, int], frozenset]:
+    files = []
+    dirs = {}
+    plain = set()
+    stack = [str(root)]
+    while stack:
+        d = stack.pop()
+        dirs[d] = os.stat(d).st_mtime_ns
+        with os.scandir(d) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".json") and entry.is_file():
+                    files.append(Path(entry.path))
+                    if not entry.is_symlink():
+                        plain.add(entry.path)
+    files.sort()
+    return files, dirs, frozenset(plain)
+
+
+def _data_listing() -> tuple[dict[str, int], list[Path], frozenset]:
+    listing = _LIST_CACHE["listing"]
+    if listing is not None:
+        try:
+            if all(os.stat(d).st_mtime_ns == m for d, m in listing[0].items()):
+                return listing
+        except OSError:
+            pass
+    files, dirs, plain = _scan_json_files(DATA_DIR)
+    listing = _LIST_CACHE["listing"] = (dirs, files, plain)
+    return listing
+
+
+def _list_data_files() -> list[Path]:
+    """Return every JSON file under DATA_DIR, rescanning only when a directory changes."""
+    return _data_listing()[1]
+
+
+def _listed_data_file(fname: str) -> Path | None:
+    """Return DATA_DIR/fname if the listing has it as a regular, non-symlink file.
+
+    Symlinked directories are never descended, so a hit is inside DATA_DIR
+    without resolving the path.
+    """
+    plain = _data_listing()[2]
+    key = os.path.normpath(os.path.join(DATA_DIR, fname))
+    return Path(key) if key in plain else None
+
+
 DATA_PATH = _choose_data_path()
 
 
-def load_questions():
-    with DATA_PATH.open("r", encoding="utf-8") as f:
-        return json.load(f)
+def _build_mojibake_map() -> dict[str, str]:
+    # UTF-8 text that was mis-decoded as Windows-1252 (e.g. "’" -> "â€™").
+    mapping = {}
+    for c in "‘’‚“”„†‡•…‰‹›–—™€−≈≤≥":
+        mapping.setdefault(c.encode("utf-8").decode("cp1252", errors="replace"), c)
+    for cp in range(0xA0, 0x100):
+        c = chr(cp)
+        bad = c.encode("utf-8").decode("cp1252", errors="replace")
+        # Undefined cp1252 bytes collapse to U+FFFD and are ambiguous; skip them.
+        if "\ufffd" not in bad:
+            mapping.setdefault(bad, c)
+    return mapping
+
+
+_MOJIBAKE_MAP = _build_mojibake_map()
+_MOJIBAKE_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(_MOJIBAKE_MAP, key=len, reverse=True))
+)
 
 
 def _fix_mojibake(val):
-    """Attempt to repair common UTF-8/Windows-1252 mojibake (â€™ â€“ â€œ â€ etc.).
-    If suspicious characters are present, try latin1->utf-8 re-decode.
+    """Attempt to repair common UTF-8/Windows-1252 mojibake (â€™ â€“ â€œ â€ etc.).
+    Known sequences are swapped in a single regex pass; clean strings are returned as-is.
     """
-    if not isinstance(val, str):
+    # isascii() reads the string's kind flag, so plain-ASCII text returns in O(1)
+    if not isinstance(val, str) or val.isascii():
         return val
-    if "â" in val or "�" in val or "€" in val:
-        try:
-            fixed = val.encode("latin1", errors="ignore").decode(
-                "utf-8", errors="ignore"
-            )
-            if fixed and fixed != val:
-                return fixed
-        except Exception:
-            pass
+    if "â" in val or "Ã" in val or "Â" in val:
+        return _MOJIBAKE_RE.sub(lambda m: _MOJIBAKE_MAP[m.group(0)], val)
     return val
 
 
+_EXTRA_KEYS = frozenset({"id", "topic", "model", "category", "difficulty"})
+
+
 def _normalize_questions(raw):
+    fix = _fix_mojibake
+    keep = _EXTRA_KEYS
+
     def norm_one(q):
+        get = q.get
         # Text/stem
-        text = _fix_mojibake(q.get("text") or q.get("stem") or q.get("question") or "")
+        text = fix(get("text") or get("stem") or get("question") or "")
 
         # Choices and answer index
         choices = []
         answer_idx = 0
+        raw_choices = get("choices")
+        raw_answer = get("answer")
+        opts = get("options")
 
-        if isinstance(q.get("choices"), list) and q.get("choices"):
-            choices = [_fix_mojibake(x) for x in list(q["choices"])]  # copy
+        if isinstance(raw_choices, list) and raw_choices:
+            choices = [fix(x) for x in raw_choices]  # copy
             # Prefer explicit integer index
-            if isinstance(q.get("answer"), int):
-                answer_idx = int(q["answer"])
-            else:
-                # Try map from letter if present
-                letter = (q.get("answer_letter") or "").strip().upper().rstrip(".")
-                if (
-                    letter in choices and False
-                ):  # placeholder to keep branch structure readable
-                    pass
-        elif isinstance(q.get("options"), dict) and q.get("options"):
-            opts = q["options"]
+            if isinstance(raw_answer, int):
+                answer_idx = int(raw_answer)
+        elif isinstance(opts, dict) and opts:
             # Keep alphabetical A..Z ordering for stable UI
-            letters = [c for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" if c in opts]
-            choices = [_fix_mojibake(opts[k]) for k in letters]
+            letters = sorted(k for k in opts if len(k) == 1 and "A" <= k <= "Z")
+            choices = [fix(opts[k]) for k in letters]
             # Derive answer index from a letter-like field
             ans_letter = (
-                (q.get("correct_answer") or q.get("answer_letter") or "")
+                (get("correct_answer") or get("answer_letter") or "")
                 .strip()
                 .upper()
             )
@@ -114,24 +206,21 @@ def _normalize_questions(raw):
                 answer_idx = letters.index(ans_letter)
             else:
                 # Fallback to provided index if any
-                if isinstance(q.get("answer"), int):
-                    answer_idx = int(q["answer"]) or 0
+                if isinstance(raw_answer, int):
+                    answer_idx = int(raw_answer) or 0
                 else:
                     answer_idx = 0
         else:
             # Last resort fallbacks
-            choices = [_fix_mojibake(x) for x in list(q.get("choices") or [])]
-            answer_idx = int(q.get("answer") or 0)
+            choices = [fix(x) for x in raw_choices or ()]
+            answer_idx = int(raw_answer or 0)
 
         # Explanation/rationale if present
-        explanation = _fix_mojibake(
-            q.get("explanation") or q.get("explanations") or q.get("rationale")
-        )
+        explanation = fix(get("explanation") or get("explanations") or get("rationale"))
 
         # Minimal extras: include common fields and merge nested extras
-        keep = {"id", "topic", "model", "category", "difficulty"}
         extras = {k: v for k, v in q.items() if k in keep}
-        nested_extras = q.get("extras")
+        nested_extras = get("extras")
         if isinstance(nested_extras, dict):
             for k, v in nested_extras.items():
                 if k in keep and k not in extras:
@@ -331,14 +420,147 @@ def _render_explanation_html(text: str) -> str:
     return mark_safe(_render_markdown_basic(normalized))
 
 
-QUESTIONS = _normalize_questions(load_questions())
-# Derive a default topic from the default data path for the MCQ view
-try:
-    _rel = DATA_PATH.resolve().relative_to(DATA_DIR.resolve())
-    _parts = list(_rel.parts)
-    TOPIC_DEFAULT = _parts[0] if len(_parts) > 1 else "General"
-except Exception:
-    TOPIC_DEFAULT = "General"
+def _topic_for_path(path: Path) -> str:
+    try:
+        parts = path.resolve().relative_to(DATA_DIR).parts
+    except Exception:
+        return "General"
+    return parts[0] if len(parts) > 1 else "General"
+
+
+def _client_json(q: dict, explanation_html, extras: dict) -> str:
+    # Provide only the data used client-side, escaped once for the data-json attribute
+    return mark_safe(
+        escape(
+            _json_dumps(
+                {
+                    "text": q["text"],
+                    "choices": q["choices"],
+                    "answer": q["answer"],
+                    "explanation": q["explanation"],
+                    "explanation_html": str(explanation_html),
+                    "extras": extras,
+                }
+            )
+        )
+    )
+
+
+def _prepare_for_client(questions: list[dict], topic: str | None) -> list[dict]:
+    """Fill in the default topic and precompute the per-question template fields once."""
+    for q in questions:
+        extras = q["extras"]
+        if topic and not (extras.get("topic") or extras.get("category")):
+            extras["topic"] = topic
+        explanation_html = _render_explanation_html(q["explanation"])
+        q["_template"] = {
+            "text": q["text"],
+            "text_html": _render_stem_html(q["text"]),
+            "choices": tuple(
+                (idx, choice, _render_choice_html(choice)) for idx, choice in enumerate(q["choices"])
+            ),
+            "answer": q["answer"],
+            "explanation": q["explanation"],
+            "explanation_html": explanation_html,
+            "extras": extras,
+            "json": _client_json(q, explanation_html, extras),
+        }
+    return questions
+
+
+def _with_extras(q: dict, extras: dict) -> dict:
+    """Copy a prepared question with new extras, reusing its rendered HTML."""
+    q = dict(q, extras=extras)
+    tpl = q["_template"]
+    q["_template"] = dict(tpl, extras=extras, json=_client_json(q, tpl["explanation_html"], extras))
+    return q
+
+
+_QKEYS: tuple[str, ...] = tuple(f"q{i}" for i in range(256))
+
+
+def _qkeys(n: int) -> tuple[str, ...]:
+    """Return the form field names q0..q{n-1}, reusing one shared tuple."""
+    global _QKEYS
+    keys = _QKEYS
+    if len(keys) < n:
+        # Rebind rather than extend so concurrent readers never see a partial tuple
+        keys = _QKEYS = tuple(f"q{i}" for i in range(max(n, 2 * len(keys))))
+    return keys
+
+
+def _enrich_prepared(questions: list[dict], checked: dict | None = None) -> list[dict]:
+    """Build template payloads from questions that went through _prepare_for_client."""
+    if not checked:
+        return [dict(q["_template"], index=i, selected=None) for i, q in enumerate(questions)]
+    get = checked.get
+    return [
+        dict(q["_template"], index=i, selected=get(key))
+        for i, (q, key) in enumerate(zip(questions, _qkeys(len(questions))))
+    ]
+
+
+# Normalized questions per quiz file, keyed by path and validated against mtime.
+# Unbounded on purpose: keys are the finite set of files under DATA_DIR, and
+# master()/prewarm load all of them, so an LRU cap would just evict its own entries.
+_QCACHE: dict[str, tuple[int, list[dict]]] = {}
+
+
+def _load_normalized(path: Path) -> list[dict]:
+    """Return normalized questions for ``path``, reparsing only when the file changes.
+
+    The returned list is shared between requests; callers must copy before mutating.
+    """
+    key = str(path)
+    mtime = path.stat().st_mtime_ns
+    # Plain dict get/set are atomic, so concurrent requests need no lock
+    hit = _QCACHE.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    qs = _prepare_for_client(_normalize_questions(_json_loads(path.read_bytes())), _topic_for_path(path))
+    _QCACHE[key] = (mtime, qs)
+    return qs
+
+
+# Aggregated master() pool, rebuilt only when one of the per-file cached lists changes.
+# "pool" is (per-file lists, flattened questions, relative files), swapped in as one tuple.
+_MASTER_CACHE: dict = {"pool": ((), [], [])}
+
+
+def _master_pool() -> tuple[list[dict], list[str]]:
+    """Return every cached question across data/ plus the relative files they came from."""
+    parts = []
+    files = []
+    for p in _list_data_files():
+        # Skip mistakes store
+        if p.name.lower() == "mistakes.json":
+            continue
+        try:
+            qs = _load_normalized(p)
+        except Exception:
+            continue
+        if qs:
+            parts.append(qs)
+            files.append(str(p.relative_to(DATA_DIR)).replace("\\", "/"))
+    pool = _MASTER_CACHE["pool"]
+    cached = pool[0]
+    if len(cached) != len(parts) or any(a is not b for a, b in zip(cached, parts)):
+        pool = _MASTER_CACHE["pool"] = (tuple(parts), [q for qs in parts for q in qs], files)
+    return pool[1], pool[2]
+
+
+def _warm_question_cache() -> int:
+    """Parse and normalize every quiz file up front so requests hit a warm cache."""
+    warmed = 0
+    for p in _list_data_files():
+        if p.name.lower() == "mistakes.json":
+            continue
+        try:
+            _load_normalized(p)
+        except Exception:
+            continue
+        warmed += 1
+    return warmed
 
 
 def _has_katas(questions: list[dict], source_path: Path | None = None) -> bool:
@@ -387,6 +609,26 @@ CFA_SESSION_SPECS = {
 }
 
 
+# The legacy mcq() page serves DATA_PATH from the per-file cache; GETs reuse
+# one enriched list until the file changes.
+_LEGACY_CACHE: dict = {"page": None}
+
+
+def _legacy_page() -> tuple[list[dict], list[dict], dict]:
+    """Return (questions, GET-enriched list, static context) for the legacy page."""
+    qs = _load_normalized(DATA_PATH)
+    page = _LEGACY_CACHE["page"]
+    if page is None or page[0] is not qs:
+        static = {
+            "quiz_title": DATA_PATH.stem,
+            "data_source": str(DATA_PATH),
+            "timer_seconds": _timer_seconds_for(qs, DATA_PATH),
+        }
+        # One tuple so concurrent requests never mix parts of two versions
+        page = _LEGACY_CACHE["page"] = (qs, _enrich_prepared(qs), static)
+    return page
+
+
 def _scaled_session_allocations(spec: dict, total: int = CFA_SESSION_TOTAL) -> dict[str, int]:
     """Scale CFA midpoint weights to exact integer topic counts."""
     midpoints = {
@@ -410,29 +652,26 @@ def _scaled_session_allocations(spec: dict, total: int = CFA_SESSION_TOTAL) -> d
     return allocations
 
 
-def _load_topic_question_pool(topic: str) -> list[dict]:
+def _topic_question_refs(topic: str) -> list[str]:
+    """Return "relpath#index" refs for every question in a topic folder.
+
+    Questions are attached (with source_file) later by _load_questions_by_refs.
+    """
     topic_dir = DATA_DIR / topic
     if not topic_dir.is_dir():
         return []
 
-    pool = []
+    refs = []
     for p in sorted(topic_dir.glob("*.json")):
         if p.name.lower() == "mistakes.json" or "katas" in p.stem.lower():
             continue
         try:
-            with p.open("r", encoding="utf-8") as f:
-                qs = _normalize_questions(json.load(f))
+            qs = _load_normalized(p)
         except Exception:
             continue
         rel = str(p.relative_to(DATA_DIR)).replace("\\", "/")
-        for idx, q in enumerate(qs):
-            extras = dict(q.get("extras") or {})
-            if not (extras.get("topic") or extras.get("category")):
-                extras["topic"] = topic
-            extras["source_file"] = rel
-            q["extras"] = extras
-            pool.append({"ref": f"{rel}#{idx}", "question": q})
-    return pool
+        refs.extend(f"{rel}#{idx}" for idx in range(len(qs)))
+    return refs
 
 
 def _load_questions_by_refs(refs: list[str]) -> list[dict]:
@@ -448,25 +687,20 @@ def _load_questions_by_refs(refs: list[str]) -> list[dict]:
         grouped_refs.setdefault(rel, []).append((idx, ref))
 
     questions_by_ref = {}
-    base = DATA_DIR.resolve()
+    base = DATA_DIR
     for rel, wanted in grouped_refs.items():
         target = (base / rel).resolve()
         try:
             if not target.is_file() or not target.is_relative_to(base):
                 continue
-            with target.open("r", encoding="utf-8") as f:
-                qs = _normalize_questions(json.load(f))
-            topic = Path(rel).parts[0] if len(Path(rel).parts) > 1 else "General"
+            # Cached questions already carry the folder topic from _prepare_for_client
+            qs = _load_normalized(target)
             for idx, ref in wanted:
                 if idx < 0 or idx >= len(qs):
                     continue
-                q = dict(qs[idx])
-                extras = dict(q.get("extras") or {})
-                if not (extras.get("topic") or extras.get("category")):
-                    extras["topic"] = topic
+                extras = dict(qs[idx].get("extras") or {})
                 extras["source_file"] = rel
-                q["extras"] = extras
-                questions_by_ref[ref] = q
+                questions_by_ref[ref] = _with_extras(qs[idx], extras)
         except Exception:
             continue
     return [questions_by_ref[ref] for ref in refs if ref in questions_by_ref]
@@ -477,52 +711,16 @@ def _build_session_refs(session_name: str) -> tuple[list[str], dict[str, int]]:
     allocations = _scaled_session_allocations(spec)
     selected = []
     for topic, count in allocations.items():
-        pool = _load_topic_question_pool(topic)
+        pool = _topic_question_refs(topic)
         if len(pool) <= count:
             picked = pool
         else:
             picked = random.sample(pool, count)
-        selected.extend(item["ref"] for item in picked)
+        selected.extend(picked)
     random.shuffle(selected)
     return selected, allocations
 
 
-def _enrich_questions_for_template(questions: list[dict], checked: dict | None = None) -> list[dict]:
-    checked = checked or {}
-    enriched = []
-    for i, q in enumerate(questions):
-        text = q.get("text", "")
-        choices = q.get("choices", [])
-        answer = q.get("answer", 0)
-        explanation = q.get("explanation")
-        explanation_html = _render_explanation_html(explanation)
-        extras = dict(q.get("extras", {}))
-        enriched.append(
-            {
-                "index": i,
-                "text": text,
-                "text_html": _render_stem_html(text),
-                "choices": [(idx, choice, _render_choice_html(choice)) for idx, choice in enumerate(choices)],
-                "answer": answer,
-                "selected": checked.get(f"q{i}"),
-                "explanation": explanation,
-                "explanation_html": explanation_html,
-                "extras": extras,
-                "json": json.dumps(
-                    {
-                        "text": text,
-                        "choices": choices,
-                        "answer": answer,
-                        "explanation": explanation,
-                        "explanation_html": str(explanation_html),
-                        "extras": extras,
-                    }
-                ),
-            }
-        )
-    return enriched
-
-
 def _session_section(q: dict) -> str:
     extras = q.get("extras") or {}
     source_file = (extras.get("source_file") or "").strip()
@@ -544,9 +742,9 @@ def _session_grand_section(q: dict) -> str:
 def _build_session_report(questions: list[dict], checked: dict) -> dict:
     section_stats: dict[str, dict] = {}
     wrong = []
+    answered_wrong = []
     correctness = []
-    for i, q in enumerate(questions):
-        key = f"q{i}"
+    for i, (q, key) in enumerate(zip(questions, _qkeys(len(questions)))):
         selected_idx = checked.get(key)
         answer_idx = q.get("answer", 0)
         is_answered = selected_idx is not None
@@ -582,10 +780,12 @@ def _build_session_report(questions: list[dict], checked: dict) -> dict:
                 }
             )
             if is_answered:
-                try:
-                    _append_mistake(q)
-                except Exception:
-                    pass
+                answered_wrong.append(q)
+
+    try:
+        _record_mistakes(answered_wrong)
+    except Exception:
+        pass
 
     score, streak, longest = _score_and_streak(correctness)
     sections = []
@@ -635,26 +835,71 @@ def _load_katas_html() -> str:
     return fallback_html
 
 
-def _score_and_streak(answers):
-    # answers: list[bool] indicating correctness per question
-    score = sum(1 for a in answers if a)
-    # current streak: consecutive correct answers at the end
+def _grade_post(questions: list[dict], post) -> tuple[dict, list[bool], list[dict]]:
+    """Grade the q{i} selections in POST data: (checked, correctness, answered-but-wrong)."""
+    checked = {}
+    correctness = []
+    wrong = []
+    # One plain-dict snapshot instead of a QueryDict lookup per question
+    get = post.dict().get if hasattr(post, "dict") else post.get
+    for q, key in zip(questions, _qkeys(len(questions))):
+        val = get(key)
+        try:
+            selected_idx = int(val) if val is not None else None
+        except (TypeError, ValueError):
+            selected_idx = None
+        is_correct = selected_idx is not None and selected_idx == q.get("answer", 0)
+        checked[key] = selected_idx
+        correctness.append(is_correct)
+        if selected_idx is not None and not is_correct:
+            wrong.append(q)
+    return checked, correctness, wrong
+
+
+def _quiz_context(request, questions: list[dict], enriched=None, record_mistakes=True) -> dict:
+    """Grade a POST against prepared questions and build the shared mcq.html context."""
+    checked = {}
+    score = 0
     streak = 0
-    for a in reversed(answers):
-        if a:
-            streak += 1
-        else:
-            break
-    # longest streak (for display if needed)
     longest = 0
-    cur = 0
+
+    if request.method == "POST":
+        checked, correctness, wrong = _grade_post(questions, request.POST)
+        if record_mistakes:
+            try:
+                _record_mistakes(wrong)
+            except Exception:
+                pass
+        score, streak, longest = _score_and_streak(correctness)
+        enriched = None
+
+    # Template fields were precomputed by _prepare_for_client
+    if enriched is None:
+        enriched = _enrich_prepared(questions, checked)
+
+    return {
+        "questions": enriched,
+        "total": len(questions),
+        "score": score,
+        "streak": streak,
+        "longest": longest,
+        "checked": checked,
+    }
+
+
+def _score_and_streak(answers):
+    # answers: list[bool] indicating correctness per question
+    # Single pass: the run still open at the end is the current streak.
+    score = cur = longest = 0
     for a in answers:
         if a:
+            score += 1
             cur += 1
-            longest = max(longest, cur)
+            if cur > longest:
+                longest = cur
         else:
             cur = 0
-    return score, streak, longest
+    return score, cur, longest
 
 
 def _upstash_cfg():
@@ -665,6 +910,62 @@ def _upstash_cfg():
     return None, None
 
 
+_UPSTASH_LOCAL = threading.local()
+
+
+def _upstash_request(method: str, base: str, token: str, path: str, body=None, timeout=5):
+    """Send one request over this thread's keep-alive connection to ``base``.
+
+    Reusing the connection skips a TCP+TLS handshake on every call. A
+    reused connection the server has since dropped is retried once on a fresh
+    one; timeouts and other errors are never retried.
+    """
+    u = urllib.parse.urlsplit(base)
+    headers = {"Authorization": f"Bearer {token}"}
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    while True:
+        conn = getattr(_UPSTASH_LOCAL, "conn", None)
+        reused = conn is not None and _UPSTASH_LOCAL.netloc == (u.scheme, u.netloc)
+        if not reused:
+            if conn is not None:
+                conn.close()
+            cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+            conn = cls(u.netloc, timeout=timeout)
+            _UPSTASH_LOCAL.conn, _UPSTASH_LOCAL.netloc = conn, (u.scheme, u.netloc)
+        conn.timeout = timeout
+        stage = "send"
+        try:
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.request(method, u.path.rstrip("/") + path, body=body, headers=headers)
+            stage = "wait"
+            resp = conn.getresponse()
+            stage = "read"
+            data = resp.read().decode("utf-8", "ignore")
+        except (http.client.HTTPException, OSError) as exc:
+            conn.close()
+            _UPSTASH_LOCAL.conn = None
+            # Only a stale socket is safe to retry: the write failed, or the server
+            # closed without answering. Anything later (a timeout, a reset while
+            # reading the body) may follow a pipeline LPUSH that already ran.
+            stale = (stage == "send" and isinstance(exc, BrokenPipeError)) or (
+                stage == "wait" and isinstance(exc, http.client.RemoteDisconnected)
+            )
+            if not (reused and stale):
+                raise
+            continue
+        if resp.will_close:
+            conn.close()
+            _UPSTASH_LOCAL.conn = None
+        if resp.status >= 400:
+            raise OSError(f"Upstash HTTP {resp.status}")
+        try:
+            return _json_loads(data)
+        except Exception:
+            return {"raw": data}
+
+
 def _upstash_call(command: str, *args: str):
     # Use simple REST form: /{command}/{arg1}/{arg2}/...
     base, token = _upstash_cfg()
@@ -672,45 +973,176 @@ def _upstash_call(command: str, *args: str):
         return None
     try:
         parts = [command] + [urllib.parse.quote(str(a), safe='') for a in args]
-        url = base.rstrip('/') + '/' + '/'.join(parts)
-        req = urllib.request.Request(
-            url,
-            headers={"Authorization": f"Bearer {token}"},
-            method="GET",
-        )
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            body = resp.read().decode("utf-8", "ignore")
-            try:
-                return json.loads(body)
-            except Exception:
-                return {"raw": body}
+        return _upstash_request("GET", base, token, "/" + "/".join(parts), timeout=5)
+    except Exception:
+        return None
+
+
+def _upstash_pipeline(commands: list[list[str]]):
+    # Send several commands in one round-trip: POST /pipeline [["LSET", k, i, v], ...]
+    base, token = _upstash_cfg()
+    if not base or not token or not commands:
+        return None
+    try:
+        body = _json_dumps([[str(a) for a in cmd] for cmd in commands]).encode("utf-8")
+        return _upstash_request("POST", base, token, "/pipeline", body=body, timeout=10)
     except Exception:
         return None
 
 
-def _append_mistake(obj: dict):
+def _append_mistakes(objs: list[dict]):
+    """Record several mistakes with one Upstash pipeline call, falling back to the local log."""
+    # Drop cached render artifacts (e.g. _template) before persisting
+    payloads = [
+        _json_dumps({k: v for k, v in obj.items() if not k.startswith("_")}) for obj in objs
+    ]
+    if not payloads:
+        return
     # Try Upstash first
-    payload = json.dumps(obj, ensure_ascii=False)
-    res = _upstash_call("lpush", "mcq:m:mistakes", payload)
-    if isinstance(res, dict) and ("result" in res or "error" not in res):
-        return  # assume success if no explicit error
-    # Fallback to local file (dev)
+    res = _upstash_pipeline([["LPUSH", "mcq:m:mistakes", payload] for payload in payloads])
+    if isinstance(res, list) and len(res) == len(payloads):
+        # Keep only the commands Upstash explicitly rejected
+        payloads = [
+            payload for payload, r in zip(payloads, res) if isinstance(r, dict) and "error" in r
+        ]
+        if not payloads:
+            _forget_mistakes_reads()
+            return
+    # Fallback to local append-only log (dev)
     try:
         DATA_DIR.mkdir(parents=True, exist_ok=True)
-        items = []
-        if MISTAKES_PATH.exists():
-            txt = MISTAKES_PATH.read_text(encoding="utf-8").strip()
-            if txt:
-                data = json.loads(txt)
-                if isinstance(data, list):
-                    items = data
-        items.append(obj)
-        MISTAKES_PATH.write_text(
-            json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        with MISTAKES_LOG_PATH.open("ab") as f:
+            f.write("".join(payload + "\n" for payload in payloads).encode("utf-8"))
     except Exception:
         # Silently ignore in production to avoid 500s
         pass
+    _forget_mistakes_reads()
+
+
+# Views hand mistakes to a background writer so scoring never waits on Upstash.
+# Serverless instances (Vercel) freeze after the response, so they write inline.
+_ASYNC_MISTAKES = os.environ.get(
+    "MCQ_ASYNC_MISTAKES", "0" if os.environ.get("VERCEL") else "1"
+) not in ("0", "false", "False")
+# Bounded so a stalled Upstash can't grow memory without limit; overflow is written inline
+_MISTAKE_QUEUE: "queue.Queue[dict]" = queue.Queue(maxsize=1024)
+_MISTAKE_BATCH_WINDOW = 0.05
+_MISTAKE_BATCH_MAX = 64
+# How long interpreter shutdown may spend writing out what is still queued
+_MISTAKE_FLUSH_TIMEOUT = 10.0
+_mistake_worker = None
+_mistake_worker_lock = threading.Lock()
+
+
+def _drain_mistake_queue():
+    while True:
+        batch = [_MISTAKE_QUEUE.get()]
+        # Gather whatever else arrives shortly after so it shares one pipeline call
+        deadline = time.monotonic() + _MISTAKE_BATCH_WINDOW
+        while len(batch) < _MISTAKE_BATCH_MAX and (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(_MISTAKE_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _append_mistakes(batch)
+        except Exception:
+            pass
+        finally:
+            for _ in batch:
+                _MISTAKE_QUEUE.task_done()
+
+
+def _flush_mistake_queue(timeout: float = _MISTAKE_FLUSH_TIMEOUT):
+    """Write out queued mistakes at shutdown, since the daemon writer is killed with the process."""
+    q = _MISTAKE_QUEUE
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        batch = []
+        while len(batch) < _MISTAKE_BATCH_MAX:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            break
+        try:
+            _append_mistakes(batch)
+        except Exception:
+            pass
+        finally:
+            for _ in batch:
+                q.task_done()
+    # Give the writer a chance to finish the batch it already took off the queue
+    with q.all_tasks_done:
+        q.all_tasks_done.wait_for(lambda: not q.unfinished_tasks, max(0.0, deadline - time.monotonic()))
+
+
+def _record_mistakes(objs: list[dict]):
+    """Persist mistakes off the request thread when possible."""
+    global _mistake_worker
+    if not objs:
+        return
+    if not _ASYNC_MISTAKES:
+        _append_mistakes(objs)
+        return
+    with _mistake_worker_lock:
+        if _mistake_worker is None or not _mistake_worker.is_alive():
+            if _mistake_worker is None:
+                atexit.register(_flush_mistake_queue)
+            _mistake_worker = threading.Thread(
+                target=_drain_mistake_queue, name="mcq-mistakes", daemon=True
+            )
+            _mistake_worker.start()
+    overflow = []
+    for obj in objs:
+        try:
+            _MISTAKE_QUEUE.put_nowait(obj)
+        except queue.Full:
+            overflow.append(obj)
+    if overflow:
+        _append_mistakes(overflow)
+
+
+def _read_local_mistakes() -> list:
+    """Return the legacy mistakes.json list followed by every entry in mistakes.jsonl."""
+    items = []
+    try:
+        if MISTAKES_PATH.exists():
+            data = _json_loads(MISTAKES_PATH.read_bytes())
+            if isinstance(data, list):
+                items.extend(data)
+    except Exception:
+        pass
+    try:
+        with MISTAKES_LOG_PATH.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    items.append(_json_loads(line))
+                except Exception:
+                    continue
+    except OSError:
+        pass
+    return items
+
+
+def _count_local_mistakes() -> int:
+    n = 0
+    try:
+        if MISTAKES_PATH.exists():
+            data = _json_loads(MISTAKES_PATH.read_bytes())
+            if isinstance(data, list):
+                n += len(data)
+    except Exception:
+        pass
+    try:
+        # Skip blank lines, as _read_local_mistakes does, so the badge matches the page
+        n += sum(1 for line in MISTAKES_LOG_PATH.read_bytes().split(b"\n") if line.strip())
+    except OSError:
+        pass
+    return n
 
 
 def _upstash_scalar(command: str, args: list[str]):
@@ -720,22 +1152,46 @@ def _upstash_scalar(command: str, args: list[str]):
     return None
 
 
+# The home page badge doesn't need an up-to-the-second count
+_MISTAKES_COUNT_TTL = 10.0
+_MISTAKES_COUNT_CACHE: dict = {"ts": 0.0, "count": None}
+
+
 def _mistakes_count() -> int:
+    cached = _MISTAKES_COUNT_CACHE["count"]
+    if cached is not None and time.monotonic() - _MISTAKES_COUNT_CACHE["ts"] < _MISTAKES_COUNT_TTL:
+        return cached
     n = _upstash_scalar("LLEN", ["mcq:m:mistakes"])  # type: ignore[arg-type]
-    if isinstance(n, int):
-        return n
-    # Fallback to file length in dev
-    try:
-        if MISTAKES_PATH.exists():
-            data = json.loads(MISTAKES_PATH.read_text(encoding="utf-8"))
-            if isinstance(data, list):
-                return len(data)
-    except Exception:
-        return 0
-    return 0
+    if not isinstance(n, int):
+        # Fallback to local store length in dev
+        n = _count_local_mistakes()
+    _MISTAKES_COUNT_CACHE["count"] = n
+    _MISTAKES_COUNT_CACHE["ts"] = time.monotonic()
+    return n
+
+
+# Short-lived copy of the mistakes list so page refreshes don't refetch it from Upstash
+_MISTAKES_READ_TTL = 5.0
+_MISTAKES_READ_CACHE: dict = {"ts": 0.0, "items": None}
+
+
+def _forget_mistakes_reads():
+    # Called after each write so the next read sees it
+    _MISTAKES_READ_CACHE["items"] = None
+    _MISTAKES_COUNT_CACHE["count"] = None
 
 
 def _load_mistakes_list() -> list:
+    cached = _MISTAKES_READ_CACHE["items"]
+    if cached is not None and time.monotonic() - _MISTAKES_READ_CACHE["ts"] < _MISTAKES_READ_TTL:
+        return cached
+    items = _fetch_mistakes_list()
+    _MISTAKES_READ_CACHE["items"] = items
+    _MISTAKES_READ_CACHE["ts"] = time.monotonic()
+    return items
+
+
+def _fetch_mistakes_list() -> list:
     # Try Upstash first (newest first since we LPUSH)
     res = _upstash_call("lrange", "mcq:m:mistakes", "0", "-1")
     items: list = []
@@ -743,96 +1199,46 @@ def _load_mistakes_list() -> list:
         arr = res["result"]
         for x in arr:
             try:
-                items.append(json.loads(x) if isinstance(x, str) else x)
+                items.append(_json_loads(x) if isinstance(x, str) else x)
             except Exception:
                 pass
-    # Fallback to file (dev)
-    if not items and MISTAKES_PATH.exists():
-        try:
-            data = json.loads(MISTAKES_PATH.read_text(encoding="utf-8"))
-            if isinstance(data, list):
-                items = data
-        except Exception:
-            items = []
+    # Fallback to local store (dev)
+    if not items:
+        items = _read_local_mistakes()
     return items
 
 
-@require_http_methods(["GET", "POST"])
-def mcq(request):
-    total = len(QUESTIONS)
-    checked = {}
-    score = 0
-    streak = 0
-    longest = 0
+# (fetched raw list, prepared questions), swapped in as one tuple
+_MISTAKES_PREPARED: dict = {"entry": None}
 
-    if request.method == "POST":
-        correctness = []
-        for i, q in enumerate(QUESTIONS):
-            key = f"q{i}"
-            val = request.POST.get(key)
-            try:
-                selected_idx = int(val) if val is not None else None
-            except (TypeError, ValueError):
-                selected_idx = None
-            is_correct = selected_idx is not None and selected_idx == q["answer"]
-            correctness.append(is_correct)
-            checked[key] = selected_idx
-            if selected_idx is not None and not is_correct:
-                try:
-                    _append_mistake(q)
-                except Exception:
-                    pass
-        score, streak, longest = _score_and_streak(correctness)
 
-    # Prepare enriched question payloads including explanation and minimal attributes
-    enriched = []
-    for i, q in enumerate(QUESTIONS):
-        # Defensive copies
-        text = q.get("text", "")
-        choices = q.get("choices", [])
-        answer = q.get("answer", 0)
-        explanation = q.get("explanation")
-        explanation_html = _render_explanation_html(explanation)
-        # Minimal extras already computed during normalization; ensure topic present
-        extras = dict(q.get("extras", {}))
-        if not (extras.get("topic") or extras.get("category")):
-            extras["topic"] = TOPIC_DEFAULT
-        enriched.append(
-            {
-                "index": i,
-                "text": text,
-                "text_html": _render_stem_html(text),
-                "choices": [(idx, choice, _render_choice_html(choice)) for idx, choice in enumerate(choices)],
-                "answer": answer,
-                "selected": checked.get(f"q{i}"),
-                "explanation": explanation,
-                "explanation_html": explanation_html,
-                "extras": extras,
-                # Provide only the data used client-side
-                "json": json.dumps(
-                    {
-                        "text": text,
-                        "choices": choices,
-                        "answer": answer,
-                        "explanation": explanation,
-                        "explanation_html": str(explanation_html),
-                        "extras": extras,
-                    }
-                ),
-            }
-        )
+def _mistakes_questions() -> list[dict]:
+    """Normalize and prepare the mistakes list, once per fetched list."""
+    raw_items = _load_mistakes_list()
+    entry = _MISTAKES_PREPARED["entry"]
+    if entry is not None and entry[0] is raw_items:
+        return entry[1]
+    items = raw_items if isinstance(raw_items, list) else []
+    questions = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        # Records come from the public mistake API; skip any one that doesn't normalize
+        try:
+            # _normalize_questions handles various schemas (text/stem/question, options/choices, etc.)
+            questions.extend(_prepare_for_client(_normalize_questions([item]), None))
+        except Exception:
+            continue
+    _MISTAKES_PREPARED["entry"] = (raw_items, questions)
+    return questions
 
-    context = {
-        "questions": enriched,
-        "total": total,
-        "score": score,
-        "streak": streak,
-        "longest": longest,
-        "checked": checked,
-        "quiz_title": DATA_PATH.stem,
-        "data_source": str(DATA_PATH),
-        "timer_seconds": _timer_seconds_for(QUESTIONS, DATA_PATH),
-    }
+
+@require_http_methods(["GET", "POST"])
+def mcq(request):
+    questions, enriched, static = _legacy_page()
+    # GET reuses the prebuilt list
+    context = _quiz_context(request, questions, enriched=enriched)
+    context.update(static)
     return render(request, "quiz/mcq.html", context)
 
 
@@ -840,47 +1246,51 @@ def reset(request):
     return redirect("mcq")
 
 
-def home(request):
-    # Build hierarchical grouping by top-level folder under data/
-    # Example: Equity/Foo.json -> section "Equity" with item Foo.json
-    def _title_size_class(name: str) -> str:
-        name_len = len(name)
-        if name_len >= 72:
-            return "card-title-compact"
-        if name_len >= 48:
-            return "card-title-small"
-        return "card-title-regular"
+# (listing, grouped sections), swapped in as one tuple so a listing is never paired with stale groups
+_HOME_GROUPS_CACHE: dict = {"entry": None}
 
-    groups = {}
-    for p in sorted(DATA_DIR.rglob("*.json")):
-        try:
-            rel = p.relative_to(DATA_DIR)
-        except ValueError:
-            continue
-        parts = list(rel.parts)
-        if not parts:
-            continue
-        if len(parts) == 1:
-            section = "General"
-            fname = parts[0]
-        else:
-            section = parts[0]
-            fname = str(rel)
-        section_key = section
-        groups.setdefault(section_key, [])
-        title = Path(fname).stem
-        groups[section_key].append(
+
+def _title_size_class(name: str) -> str:
+    name_len = len(name)
+    if name_len >= 72:
+        return "card-title-compact"
+    if name_len >= 48:
+        return "card-title-small"
+    return "card-title-regular"
+
+
+def _home_groups() -> list[dict]:
+    """Group the data listing by top-level folder, rebuilt only when the listing changes."""
+    # Example: Equity/Foo.json -> section "Equity" with item Foo.json
+    files = _list_data_files()
+    entry = _HOME_GROUPS_CACHE["entry"]
+    if entry is not None and entry[0] is files:
+        return entry[1]
+    groups = defaultdict(list)
+    for p in files:
+        # The listing is rooted at DATA_DIR, so every entry is relative to it
+        relpath = p.relative_to(DATA_DIR).as_posix()
+        section, sep, _ = relpath.partition("/")
+        title = p.stem
+        groups[section if sep else "General"].append(
             {
                 "name": title,
-                "relpath": str(rel).replace("\\", "/"),
+                "relpath": relpath,
                 "title_size_class": _title_size_class(title),
             }
         )
     # Sort groups and items within
     grouped = []
-    for sec in sorted(groups.keys(), key=lambda s: s.lower()):
+    for sec in sorted(groups, key=str.lower):
         items = sorted(groups[sec], key=lambda x: x["name"].lower())
         grouped.append({"section": sec, "items": items})
+    _HOME_GROUPS_CACHE["entry"] = (files, grouped)
+    return grouped
+
+
+def home(request):
+    # Build hierarchical grouping by top-level folder under data/
+    grouped = _home_groups()
     mistakes_count = _mistakes_count()
     katas_html = _load_katas_html()
     return render(
@@ -892,160 +1302,43 @@ def home(request):
 
 def play(request, fname):
     # Render the MCQ page for the chosen JSON file within data/
-    base = DATA_DIR.resolve()
-    # Normalize and prevent path traversal
-    target = (base / fname).resolve()
-    if (
-        not str(target).lower().endswith(".json")
-        or not target.exists()
-        or not target.is_file()
-        or not target.is_relative_to(base)
-    ):
-        # Fallback to home listing if invalid
-        return redirect("home")
-
-    # Load and normalize questions from the selected file
-    with target.open("r", encoding="utf-8") as f:
-        raw = json.load(f)
-    questions = _normalize_questions(raw)
-    # Derive topic for this file and inject into extras if missing
-    try:
-        rel = target.resolve().relative_to(DATA_DIR.resolve())
-        parts = list(rel.parts)
-        topic_for_file = parts[0] if len(parts) > 1 else "General"
-    except Exception:
-        topic_for_file = "General"
-    for _q in questions:
+    base = DATA_DIR
+    # Files from the cached listing are already known to be safe regular files
+    target = _listed_data_file(fname)
+    if target is None:
+        # Normalize and prevent path traversal
+        target = (base / fname).resolve()
+        # Pure path checks first, then a single stat for existence + regular file
+        if not target.name.lower().endswith(".json") or not target.is_relative_to(base):
+            # Fallback to home listing if invalid
+            return redirect("home")
         try:
-            _ex = dict(_q.get("extras") or {})
-            if not (_ex.get("topic") or _ex.get("category")):
-                _ex["topic"] = topic_for_file
-                _q["extras"] = _ex
-        except Exception:
-            pass
+            if not S_ISREG(target.stat().st_mode):
+                return redirect("home")
+        except OSError:
+            return redirect("home")
+
+    # Load normalized questions (topic already injected) from the per-mtime cache
+    questions = list(_load_normalized(target))
     # Randomize question order before rendering
     try:
         random.shuffle(questions)
     except Exception:
         pass
 
-    total = len(questions)
-    checked = {}
-    score = 0
-    streak = 0
-    longest = 0
-
-    if request.method == "POST":
-        correctness = []
-        for i, q in enumerate(questions):
-            key = f"q{i}"
-            val = request.POST.get(key)
-            try:
-                selected_idx = int(val) if val is not None else None
-            except (TypeError, ValueError):
-                selected_idx = None
-            is_correct = selected_idx is not None and selected_idx == q["answer"]
-            correctness.append(is_correct)
-            checked[key] = selected_idx
-            if selected_idx is not None and not is_correct:
-                try:
-                    _append_mistake(q)
-                except Exception:
-                    pass
-        score, streak, longest = _score_and_streak(correctness)
-
-    # Build enriched payload like legacy view
-    enriched = []
-    for i, q in enumerate(questions):
-        text = q.get("text", q.get("stem", ""))
-        choices = q.get("choices", [])
-        answer = q.get("answer", 0)
-        # Backward compatibility: support legacy shape with 'items' and 'correct' letter
-        if (not choices) and isinstance(q.get("items"), list):
-            try:
-                items = q.get("items") or []
-                choices = [v for _, v in items]
-                correct = str(q.get("correct", "")).strip()
-                letters = [k for k, _ in items]
-                if correct in letters:
-                    answer = letters.index(correct)
-            except Exception:
-                pass
-        explanation = q.get("explanation")
-        explanation_html = _render_explanation_html(explanation)
-        extras = dict(q.get("extras", {}))
-        enriched.append(
-            {
-                "index": i,
-                "text": text,
-                "text_html": _render_stem_html(text),
-                "choices": [(idx, choice, _render_choice_html(choice)) for idx, choice in enumerate(choices)],
-                "answer": answer,
-                "selected": checked.get(f"q{i}"),
-                "explanation": explanation,
-                "explanation_html": explanation_html,
-                "extras": extras,
-                "json": json.dumps(
-                    {
-                        "text": text,
-                        "choices": choices,
-                        "answer": answer,
-                        "explanation": explanation,
-                        "explanation_html": str(explanation_html),
-                        "extras": extras,
-                    }
-                ),
-            }
-        )
-
-    context = {
-        "questions": enriched,
-        "total": total,
-        "score": score,
-        "streak": streak,
-        "longest": longest,
-        "checked": checked,
-        "quiz_title": target.stem,
-        "data_source": str(target),
-        "timer_seconds": _timer_seconds_for(questions, target),
-    }
+    context = _quiz_context(request, questions)
+    context.update(
+        quiz_title=target.stem,
+        data_source=str(target),
+        timer_seconds=_timer_seconds_for(questions, target),
+    )
     return render(request, "quiz/mcq.html", context)
 
 
 @require_http_methods(["GET", "POST"])
 def master(request):
     # Aggregate questions from all JSON under data/, sample 180, and render
-    all_questions = []
-    files_used = []
-    for p in sorted(DATA_DIR.rglob("*.json")):
-        # Skip mistakes store
-        if p.name.lower() == "mistakes.json":
-            continue
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                raw = json.load(f)
-            qs = _normalize_questions(raw)
-            if qs:
-                # Inject topic derived from path into extras when missing
-                try:
-                    rel = p.resolve().relative_to(DATA_DIR.resolve())
-                    parts = list(rel.parts)
-                    topic_here = parts[0] if len(parts) > 1 else "General"
-                except Exception:
-                    topic_here = "General"
-                for _q in qs:
-                    try:
-                        _ex = dict(_q.get("extras") or {})
-                        if not (_ex.get("topic") or _ex.get("category")):
-                            _ex["topic"] = topic_here
-                            _q["extras"] = _ex
-                    except Exception:
-                        pass
-                all_questions.extend(qs)
-                files_used.append(str(p.relative_to(DATA_DIR)).replace("\\", "/"))
-        except Exception:
-            continue
-
+    all_questions, files_used = _master_pool()
     if not all_questions:
         return redirect("home")
 
@@ -1053,75 +1346,13 @@ def master(request):
     # random.sample ensures unique indices and random order
     selection = random.sample(all_questions, sample_size)
 
-    total = len(selection)
-    checked = {}
-    score = 0
-    streak = 0
-    longest = 0
-
-    if request.method == "POST":
-        correctness = []
-        for i, q in enumerate(selection):
-            key = f"q{i}"
-            val = request.POST.get(key)
-            try:
-                selected_idx = int(val) if val is not None else None
-            except (TypeError, ValueError):
-                selected_idx = None
-            is_correct = selected_idx is not None and selected_idx == q.get("answer", 0)
-            correctness.append(is_correct)
-            checked[key] = selected_idx
-            if selected_idx is not None and not is_correct:
-                try:
-                    _append_mistake(q)
-                except Exception:
-                    pass
-        score, streak, longest = _score_and_streak(correctness)
-
-    enriched = []
-    for i, q in enumerate(selection):
-        text = q.get("text", "")
-        choices = q.get("choices", [])
-        answer = q.get("answer", 0)
-        explanation = q.get("explanation")
-        explanation_html = _render_explanation_html(explanation)
-        extras = q.get("extras", {})
-        enriched.append(
-            {
-                "index": i,
-                "text": text,
-                "text_html": _render_stem_html(text),
-                "choices": [(idx, choice, _render_choice_html(choice)) for idx, choice in enumerate(choices)],
-                "answer": answer,
-                "selected": checked.get(f"q{i}"),
-                "explanation": explanation,
-                "explanation_html": explanation_html,
-                "extras": extras,
-                "json": json.dumps(
-                    {
-                        "text": text,
-                        "choices": choices,
-                        "answer": answer,
-                        "explanation": explanation,
-                        "explanation_html": str(explanation_html),
-                        "extras": extras,
-                    }
-                ),
-            }
-        )
-
-    context = {
-        "questions": enriched,
-        "total": total,
-        "score": score,
-        "streak": streak,
-        "longest": longest,
-        "checked": checked,
-        "quiz_title": "Master 180",
-        "data_source": f"master: {total} from {len(files_used)} files",
+    context = _quiz_context(request, selection)
+    context.update(
+        quiz_title="Master 180",
+        data_source=f"master: {len(selection)} from {len(files_used)} files",
         # For master, default to non-kata timing unless content indicates otherwise
-        "timer_seconds": _timer_seconds_for(selection, None),
-    }
+        timer_seconds=_timer_seconds_for(selection, None),
+    )
     return render(request, "quiz/mcq.html", context)
 
 
@@ -1140,129 +1371,41 @@ def session_practice(request, session_name):
     if not questions:
         return redirect("home")
 
-    checked = {}
+    # Mistakes are recorded by _build_session_report
+    context = _quiz_context(request, questions, record_mistakes=False)
     report = None
-    score = 0
-    streak = 0
-    longest = 0
     if request.method == "POST":
-        correctness = []
-        for i, q in enumerate(questions):
-            key = f"q{i}"
-            val = request.POST.get(key)
-            try:
-                selected_idx = int(val) if val is not None else None
-            except (TypeError, ValueError):
-                selected_idx = None
-            checked[key] = selected_idx
-            correctness.append(selected_idx is not None and selected_idx == q.get("answer", 0))
-        score, streak, longest = _score_and_streak(correctness)
-        report = _build_session_report(questions, checked)
-
-    context = {
-        "questions": _enrich_questions_for_template(questions, checked),
-        "total": len(questions),
-        "score": score,
-        "streak": streak,
-        "longest": longest,
-        "checked": checked,
-        "quiz_title": CFA_SESSION_SPECS[session_name]["title"],
-        "data_source": f"{session_name}: session topic mix",
-        "timer_seconds": _timer_seconds_for(questions, None),
-        "is_session_quiz": True,
-        "session_name": session_name,
-        "session_report": report,
-        "session_submitted": report is not None,
-        "session_allocations": allocations,
-        "session_refs": refs,
-    }
+        report = _build_session_report(questions, context["checked"])
+
+    context.update(
+        quiz_title=CFA_SESSION_SPECS[session_name]["title"],
+        data_source=f"{session_name}: session topic mix",
+        timer_seconds=_timer_seconds_for(questions, None),
+        is_session_quiz=True,
+        session_name=session_name,
+        session_report=report,
+        session_submitted=report is not None,
+        session_allocations=allocations,
+        session_refs=refs,
+    )
     return render(request, "quiz/mcq.html", context)
 
 
 @require_http_methods(["GET", "POST"])
 def mistakes(request):
-    # Load mistakes and normalize to ensure consistent shape
-    raw_items = _load_mistakes_list()
-    try:
-        # _normalize_questions handles various schemas (text/stem/question, options/choices, etc.)
-        questions = _normalize_questions(raw_items)
-    except Exception:
-        # Fallback: keep raw items if normalization fails
-        questions = list(raw_items) if isinstance(raw_items, list) else []
-    total = len(questions)
-    checked = {}
-    score = 0
-    streak = 0
-    longest = 0
-
-    if request.method == "POST":
-        correctness = []
-        for i, q in enumerate(questions):
-            key = f"q{i}"
-            val = request.POST.get(key)
-            try:
-                selected_idx = int(val) if val is not None else None
-            except (TypeError, ValueError):
-                selected_idx = None
-            is_correct = selected_idx is not None and selected_idx == q.get("answer", 0)
-            correctness.append(is_correct)
-            checked[key] = selected_idx
-        score, streak, longest = _score_and_streak(correctness)
-
-    enriched = []
-    for i, q in enumerate(questions):
-        text = q.get("text", "")
-        choices = q.get("choices", [])
-        answer = q.get("answer", 0)
-        explanation = q.get("explanation")
-        explanation_html = _render_explanation_html(explanation)
-        extras = q.get("extras", {})
-        enriched.append(
-            {
-                "index": i,
-                "text": text,
-                "text_html": _render_stem_html(text),
-                "choices": list(enumerate(choices)),
-                "answer": answer,
-                "selected": checked.get(f"q{i}"),
-                "explanation": explanation,
-                "explanation_html": explanation_html,
-                "extras": extras,
-                "json": json.dumps(
-                    {
-                        "text": text,
-                        "choices": choices,
-                        "answer": answer,
-                        "explanation": explanation,
-                        "explanation_html": str(explanation_html),
-                    }
-                ),
-            }
-        )
-
-    context = {
-        "questions": enriched,
-        "total": total,
-        "score": score,
-        "streak": streak,
-        "longest": longest,
-        "checked": checked,
-        "quiz_title": "Mistakes",
-        "data_source": "mistakes",
-        "timer_seconds": _timer_seconds_for(questions, None),
-    }
+    questions = _mistakes_questions()
+    # Re-missed questions are already in the store, so POSTs do not record them again
+    context = _quiz_context(request, questions, record_mistakes=False)
+    context.update(
+        quiz_title="Mistakes",
+        data_source="mistakes",
+        timer_seconds=_timer_seconds_for(questions, None),
+    )
     return render(request, "quiz/mcq.html", context)
 
 
 @require_http_methods(["GET", "POST"])
 def mistakes_grouped(request):
-    # Load mistakes, normalize, then group by topic
-    raw_items = _load_mistakes_list()
-    try:
-        questions = _normalize_questions(raw_items)
-    except Exception:
-        questions = list(raw_items) if isinstance(raw_items, list) else []
-
     # Derive topic from extras or mark as Unknown
     def topic_of(q):
         extras = q.get("extras") or {}
@@ -1270,51 +1413,23 @@ def mistakes_grouped(request):
         return t or "Unknown"
 
     groups = {}
-    for q in questions:
-        t = topic_of(q)
-        groups.setdefault(t, []).append(q)
+    for q in _mistakes_questions():
+        groups.setdefault(topic_of(q), []).append(q)
 
-    # Enrich per group
+    # Enrich per group, numbering questions across groups
     enriched_groups = []
     global_index = 0
     for t in sorted(groups.keys(), key=lambda s: s.lower()):
-        enriched = []
-        checked = {}
-        for q in groups[t]:
-            text = q.get("text", "")
-            choices = q.get("choices", [])
-            answer = q.get("answer", 0)
-            explanation = q.get("explanation")
-            explanation_html = _render_explanation_html(explanation)
-            extras = q.get("extras", {})
-            enriched.append(
-                {
-                    "index": global_index,
-                    "text": text,
-                    "text_html": _render_stem_html(text),
-                    "choices": [(idx, choice, _render_choice_html(choice)) for idx, choice in enumerate(choices)],
-                    "answer": answer,
-                    "selected": checked.get(f"q{global_index}"),
-                    "explanation": explanation,
-                    "explanation_html": explanation_html,
-                    "extras": extras,
-                    "json": json.dumps(
-                        {
-                            "text": text,
-                            "choices": choices,
-                            "answer": answer,
-                            "explanation": explanation,
-                            "explanation_html": str(explanation_html),
-                        }
-                    ),
-                }
-            )
-            global_index += 1
+        enriched = [
+            dict(q["_template"], index=global_index + i, selected=None)
+            for i, q in enumerate(groups[t])
+        ]
+        global_index += len(enriched)
         enriched_groups.append({"topic": t, "items": enriched, "count": len(enriched)})
 
     context = {
         "groups": enriched_groups,
-        "total": sum(g["count"] for g in enriched_groups),
+        "total": global_index,
         "data_source": "mistakes_grouped",
     }
     return render(request, "quiz/mistakes_grouped.html", context)
@@ -1324,13 +1439,13 @@ def mistakes_grouped(request):
 @require_http_methods(["POST"])
 def api_mistake(request):
     try:
-        payload = json.loads(request.body.decode("utf-8"))
+        payload = _json_loads(request.body)
     except Exception:
         return JsonResponse({"ok": False, "error": "invalid json"}, status=400)
     if not isinstance(payload, dict):
         return JsonResponse({"ok": False, "error": "invalid payload"}, status=400)
     try:
-        _append_mistake(payload)
+        _record_mistakes([payload])
     except Exception:
         pass
     return JsonResponse({"ok": True})
@@ -1363,7 +1478,7 @@ def api_mistakes_dump(request):
         arr = res["result"]
         for x in arr:
             try:
-                obj = json.loads(x) if isinstance(x, str) else x
+                obj = _json_loads(x) if isinstance(x, str) else x
             except Exception:
                 obj = {"raw": x}
             if isinstance(obj, dict):
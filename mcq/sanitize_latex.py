@@ -6,6 +6,9 @@ MONEYISH_INLINE_DOLLAR = re.compile(
 )
 
 def sanitize(text: str) -> str:
+    # Most strings have no dollar sign at all; skip the regex for them
+    if '$' not in text:
+        return text
     return MONEYISH_INLINE_DOLLAR.sub(r'USD \1', text)
 
 def walk(x):
@@ -19,7 +22,10 @@ def walk(x):
 
 for p in Path("C:\\karma\\mcq\\mcq\\quiz\\data").rglob("*.json"):
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        raw = p.read_text(encoding="utf-8")
+        if '$' not in raw:
+            continue
+        data = json.loads(raw)
         new = walk(data)
         if new != data:
             p.write_text(json.dumps(new, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")